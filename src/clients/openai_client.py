@@ -5,9 +5,17 @@ This version can chain multiple tool calls autonomously without user confirmatio
 Connects to MCP server via HTTP/SSE instead of stdio
 """
 
+import argparse
 import asyncio
-import json
+import logging
 import os
+import random
+import time
+from typing import Optional
+import aiohttp
+import httpx
+import orjson
+import openai
 from openai import AsyncOpenAI
 from mcp import ClientSession
 from mcp.client.sse import sse_client
@@ -15,12 +23,205 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Initialize OpenAI client
-client = AsyncOpenAI()
+# Initialize OpenAI client once for the process lifetime. The explicit httpx
+# pool keeps HTTP/2 connections alive between iterations of the tool loop so
+# follow-up completions don't pay a fresh TCP+TLS handshake.
+client = AsyncOpenAI(
+    http_client=httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=30
+        ),
+        timeout=httpx.Timeout(60.0)
+    ),
+    # call_with_backoff is the only retry layer
+    max_retries=0
+)
+
+# Shared aiohttp session for health probes (created lazily inside the loop)
+_http_session: Optional[aiohttp.ClientSession] = None
+
+logger = logging.getLogger(__name__)
+
+# Static system prompt. It is built once and never mutated so every request
+# shares a byte-identical prefix, which keeps OpenAI's prompt cache warm.
+SYSTEM_PREFIX = [
+    {
+        "role": "system",
+        "content": """You are a helpful autonomous assistant with access to tools via MCP. 
+                        
+Key behaviors:
+1. When given a multi-step task, execute ALL steps autonomously without asking for confirmation
+2. Chain tool calls together to complete complex workflows
+3. Only ask for clarification if the task is truly ambiguous
+4. After completing all steps, provide a summary of what was accomplished
+5. Be proactive and efficient in completing tasks"""
+    }
+]
 
 # MCP Server URL (SSE endpoint)
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080/sse")
 
+# Conversation history cap, applied between turns so the in-turn prefix is stable
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", "40"))
+
+# Batch API settings for non-interactive runs
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_POLL_INTERVAL = 30  # seconds
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def trim_conversation(conversation: list[dict], max_messages: int) -> None:
+    """Drop the oldest messages in place, cutting only where a user turn starts"""
+    if len(conversation) <= max_messages:
+        return
+    
+    # Advance to the next user message so no tool result is left without the
+    # assistant message that requested it
+    start = len(conversation) - max_messages
+    while start < len(conversation) and conversation[start]["role"] != "user":
+        start += 1
+    if start == len(conversation):
+        # The latest turn alone exceeds the cap; keep it from its user message
+        start = max(
+            (i for i, message in enumerate(conversation) if message["role"] == "user"),
+            default=0
+        )
+    del conversation[:start]
+
+
+async def call_mcp_tool(session: ClientSession, tool_name: str, arguments: str) -> str:
+    """Execute a single OpenAI tool call via MCP and return its text content"""
+    tool_args = orjson.loads(arguments)
+    
+    # Only pretty-print arguments when they will be shown
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Args: %s",
+            orjson.dumps(tool_args, option=orjson.OPT_INDENT_2).decode()
+        )
+    
+    # Call the MCP tool via HTTP/SSE
+    result = await session.call_tool(tool_name, tool_args)
+    
+    # Extract text content from result
+    return "".join(
+        content.text for content in result.content if hasattr(content, 'text')
+    )
+
+
+def format_tool_error(exc: BaseException) -> str:
+    """Render a failed tool call in the same shape as the server's error output"""
+    return orjson.dumps({
+        "kind": "err",
+        "success": False,
+        "error_type": type(exc).__name__,
+        "error_message": str(exc),
+        "timestamp_us": time.time_ns() // 1000
+    }).decode()
+
+
+async def call_with_backoff(*, max_retries: int = 5, **kwargs):
+    """Create a chat completion, retrying rate limits and transient failures"""
+    for attempt in range(max_retries + 1):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except (
+            openai.RateLimitError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        ) as e:
+            if attempt == max_retries:
+                raise
+            
+            # Exponential backoff with jitter, honouring Retry-After on 429s
+            delay = min(60, (2 ** attempt) + random.random())
+            if isinstance(e, openai.RateLimitError):
+                retry_after = e.response.headers.get("retry-after")
+                try:
+                    delay = min(60, float(retry_after)) if retry_after else delay
+                except ValueError:
+                    pass
+            
+            print(f"⏳ {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+
+
+async def stream_assistant_turn(
+    session: ClientSession,
+    messages: list[dict],
+    openai_tools: list[dict]
+) -> tuple[Optional[str], list[dict], list[asyncio.Task]]:
+    """Stream one completion, starting each tool call as soon as its arguments parse"""
+    stream = await call_with_backoff(
+        model="gpt-4",
+        messages=messages,
+        tools=openai_tools,
+        tool_choice="auto",
+        stream=True
+    )
+    
+    content_parts: list[str] = []
+    calls: dict[int, dict] = {}
+    tasks: dict[int, asyncio.Task] = {}
+    
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            
+            if delta.content:
+                content_parts.append(delta.content)
+            
+            for tool_delta in delta.tool_calls or []:
+                call = calls.setdefault(tool_delta.index, {"id": "", "name": "", "arguments": ""})
+                if tool_delta.id:
+                    call["id"] = tool_delta.id
+                if tool_delta.function:
+                    call["name"] += tool_delta.function.name or ""
+                    call["arguments"] += tool_delta.function.arguments or ""
+                
+                # Start the MCP call while the model is still generating
+                if tool_delta.index in tasks or not call["name"]:
+                    continue
+                try:
+                    orjson.loads(call["arguments"])
+                except orjson.JSONDecodeError:
+                    continue
+                tasks[tool_delta.index] = asyncio.create_task(
+                    call_mcp_tool(session, call["name"], call["arguments"])
+                )
+        
+        # Anything left over never parsed; dispatch it so the error is reported
+        for index, call in calls.items():
+            if index not in tasks:
+                tasks[index] = asyncio.create_task(
+                    call_mcp_tool(session, call["name"], call["arguments"])
+                )
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    
+    order = sorted(calls)
+    tool_calls = [
+        {
+            "id": calls[index]["id"],
+            "type": "function",
+            "function": {
+                "name": calls[index]["name"],
+                "arguments": calls[index]["arguments"]
+            }
+        }
+        for index in order
+    ]
+    content = "".join(content_parts) or None
+    return content, tool_calls, [tasks[index] for index in order]
+
 
 async def run_autonomous_agent():
     """Run the agent with autonomous multi-step tool execution"""
@@ -42,9 +243,10 @@ async def run_autonomous_agent():
                     print(f"  - {tool.name}: {tool.description}")
                 print()
                 
-                # Convert MCP tools to OpenAI function format
+                # Convert MCP tools to OpenAI function format, sorted by name so
+                # the tools payload serializes identically on every request
                 openai_tools = []
-                for tool in available_tools:
+                for tool in sorted(available_tools, key=lambda t: t.name):
                     openai_tools.append({
                         "type": "function",
                         "function": {
@@ -54,20 +256,8 @@ async def run_autonomous_agent():
                         }
                     })
                 
-                # Chat loop
-                messages = [
-                    {
-                        "role": "system",
-                        "content": """You are a helpful autonomous assistant with access to tools via MCP. 
-                        
-Key behaviors:
-1. When given a multi-step task, execute ALL steps autonomously without asking for confirmation
-2. Chain tool calls together to complete complex workflows
-3. Only ask for clarification if the task is truly ambiguous
-4. After completing all steps, provide a summary of what was accomplished
-5. Be proactive and efficient in completing tasks"""
-                    }
-                ]
+                # Chat loop - dynamic history only; the static prefix is sent ahead of it
+                conversation: list[dict] = []
                 
                 print("💬 Chat with the autonomous assistant (type 'quit' to exit)")
                 print("💡 Tip: Try multi-step tasks - the agent will complete them autonomously!\n")
@@ -87,8 +277,9 @@ Key behaviors:
                     if not user_input:
                         continue
                     
-                    # Add user message
-                    messages.append({
+                    # Bound history at the turn boundary, then add user message
+                    trim_conversation(conversation, MAX_HISTORY_MESSAGES)
+                    conversation.append({
                         "role": "user",
                         "content": user_input
                     })
@@ -101,54 +292,43 @@ Key behaviors:
                         while iteration < max_iterations:
                             iteration += 1
                             
-                            # Call OpenAI API
-                            response = await client.chat.completions.create(
-                                model="gpt-4",
-                                messages=messages,
-                                tools=openai_tools,
-                                tool_choice="auto"
+                            # Call OpenAI API (streamed; tools start as they arrive)
+                            content, tool_calls, tasks = await stream_assistant_turn(
+                                session,
+                                SYSTEM_PREFIX + conversation,
+                                openai_tools
                             )
                             
-                            assistant_message = response.choices[0].message
-                            
                             # Add assistant message to conversation
-                            messages.append({
-                                "role": "assistant",
-                                "content": assistant_message.content,
-                                "tool_calls": assistant_message.tool_calls
-                            })
+                            assistant_entry = {"role": "assistant", "content": content}
+                            if tool_calls:
+                                assistant_entry["tool_calls"] = tool_calls
+                            conversation.append(assistant_entry)
                             
                             # If no tool calls, we're done with this turn
-                            if not assistant_message.tool_calls:
-                                if assistant_message.content:
-                                    print(f"\nAssistant: {assistant_message.content}\n")
+                            if not tool_calls:
+                                if content:
+                                    print(f"\nAssistant: {content}\n")
                                 break
                             
                             # Execute all tool calls in this batch
                             print(f"\n🔨 Executing tools (Step {iteration})...\n")
                             
-                            for tool_call in assistant_message.tool_calls:
-                                tool_name = tool_call.function.name
-                                tool_args = json.loads(tool_call.function.arguments)
-                                
-                                print(f"  🔧 {tool_name}")
-                                print(f"     Args: {json.dumps(tool_args, indent=6)}")
-                                
-                                # Call the MCP tool via HTTP/SSE
-                                result = await session.call_tool(tool_name, tool_args)
-                                
-                                # Extract text content from result
-                                tool_result = ""
-                                for content in result.content:
-                                    if hasattr(content, 'text'):
-                                        tool_result += content.text
+                            # Independent tool calls run concurrently; results are
+                            # appended in the original order so tool_call_ids line up
+                            results = await asyncio.gather(*tasks, return_exceptions=True)
+                            
+                            for tool_call, tool_result in zip(tool_calls, results):
+                                if isinstance(tool_result, BaseException):
+                                    tool_result = format_tool_error(tool_result)
                                 
+                                print(f"  🔧 {tool_call['function']['name']}")
                                 print(f"     ✓ Result:\n{tool_result}\n")
                                 
                                 # Add tool result to messages
-                                messages.append({
+                                conversation.append({
                                     "role": "tool",
-                                    "tool_call_id": tool_call.id,
+                                    "tool_call_id": tool_call["id"],
                                     "content": tool_result
                                 })
                         
@@ -158,8 +338,8 @@ Key behaviors:
                     except Exception as e:
                         print(f"❌ Error: {e}\n")
                         # Remove the last user message to keep conversation state clean
-                        if messages[-1]["role"] == "user":
-                            messages.pop()
+                        if conversation[-1]["role"] == "user":
+                            conversation.pop()
     
     except ConnectionError as e:
         print(f"❌ Failed to connect to MCP server: {e}")
@@ -170,52 +350,169 @@ Key behaviors:
         print(f"4. Check firewall settings if connecting remotely")
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+    finally:
+        await client.close()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+
+async def close_http_session():
+    """Close the shared aiohttp session if it was opened"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
 
 
 async def check_server_health():
     """Check if the MCP server is running and healthy"""
-    import aiohttp
-    
     health_url = MCP_SERVER_URL.replace('/sse', '/health')
     
     try:
-        async with aiohttp.ClientSession() as http_session:
-            async with http_session.get(health_url, timeout=5) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Server is healthy")
-                    print(f"   Status: {data.get('status')}")
-                    print(f"   Server: {data.get('server')}")
-                    if 'tools' in data:
-                        print(f"   Tools: {', '.join(data['tools'])}")
-                    print()
-                    return True
-                else:
-                    print(f"⚠️  Server returned status {response.status}")
-                    return False
+        http_session = get_http_session()
+        async with http_session.get(health_url, timeout=5) as response:
+            if response.status == 200:
+                data = await response.json()
+                print(f"✅ Server is healthy")
+                print(f"   Status: {data.get('status')}")
+                print(f"   Server: {data.get('server')}")
+                if 'tools' in data:
+                    print(f"   Tools: {', '.join(data['tools'])}")
+                print()
+                return True
+            else:
+                print(f"⚠️  Server returned status {response.status}")
+                return False
     except Exception as e:
         print(f"⚠️  Cannot connect to server: {e}")
         print(f"   Make sure the server is running on {MCP_SERVER_URL}")
         return False
 
 
+async def run_batch(prompts_path: str) -> bool:
+    """Submit queued prompts through the OpenAI Batch API and print the replies"""
+    with open(prompts_path) as f:
+        prompts = [line.strip() for line in f if line.strip()]
+    
+    if not prompts:
+        print(f"⚠️  No prompts found in {prompts_path}")
+        return False
+    
+    # One chat completion request per prompt, in Batch API JSONL format
+    batch_input = b"\n".join(
+        orjson.dumps({
+            "custom_id": f"prompt-{index}",
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": "gpt-4",
+                "messages": SYSTEM_PREFIX + [{"role": "user", "content": prompt}]
+            }
+        })
+        for index, prompt in enumerate(prompts)
+    )
+    
+    try:
+        input_file = await client.files.create(
+            file=("batch_input.jsonl", batch_input),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h"
+        )
+        print(f"📦 Submitted batch {batch.id} with {len(prompts)} prompts\n")
+        
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+            print(f"   Status: {batch.status}")
+        
+        if batch.status != "completed":
+            print(f"❌ Batch {batch.id} finished with status: {batch.status}")
+            return False
+        
+        # Successful requests land in the output file and failed ones in the
+        # error file; either may be missing (e.g. when every request failed)
+        records = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = await client.files.content(file_id)
+                records.extend(orjson.loads(line) for line in content.text.splitlines())
+        records.sort(key=lambda record: int(record["custom_id"].removeprefix("prompt-")))
+        
+        for record in records:
+            index = int(record["custom_id"].removeprefix("prompt-"))
+            response = record.get("response") or {}
+            
+            print(f"You: {prompts[index]}")
+            if response.get("status_code") == 200:
+                reply = response["body"]["choices"][0]["message"]["content"]
+                print(f"Assistant: {reply}\n")
+            else:
+                print(f"❌ Error: {record.get('error') or response.get('body')}\n")
+        
+        if not batch.output_file_id:
+            print(f"❌ Batch {batch.id} completed without any successful requests")
+            return False
+        return True
+    finally:
+        await client.close()
+
+
+async def main() -> bool:
+    """Check server health, then run the agent on a single event loop"""
+    # Check server health before starting
+    print("🔍 Checking MCP server health...\n")
+    try:
+        server_healthy = await check_server_health()
+    finally:
+        await close_http_session()
+    
+    if not server_healthy:
+        return False
+    
+    # Run the agent
+    await run_autonomous_agent()
+    return True
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autonomous OpenAI agent for the MCP server")
+    parser.add_argument(
+        "--batch",
+        metavar="PROMPTS_FILE",
+        help="Submit one prompt per line from PROMPTS_FILE via the OpenAI Batch API (no tools)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the arguments of each tool call"
+    )
+    args = parser.parse_args()
+    
+    if args.verbose:
+        # Only this module logs at DEBUG; library loggers stay at WARNING
+        logging.basicConfig(format="     %(message)s")
+        logger.setLevel(logging.DEBUG)
+    
     # Check for OpenAI API key
     if not os.getenv("OPENAI_API_KEY"):
         print("⚠️  Warning: OPENAI_API_KEY environment variable not set")
         print("Please set it with: export OPENAI_API_KEY='your-key-here'")
         print()
     
-    # Check server health before starting
-    print("🔍 Checking MCP server health...\n")
-    server_healthy = asyncio.run(check_server_health())
+    if args.batch:
+        exit(0 if asyncio.run(run_batch(args.batch)) else 1)
     
-    if not server_healthy:
+    if not asyncio.run(main()):
         print("\n❌ Server health check failed. Please start the MCP server first:")
         print("   python pydantic_mcp_sse_server.py\n")
         exit(1)
-    
-    # Run the agent
-    asyncio.run(run_autonomous_agent())
-
-    
\ No newline at end of file
@@ -11,18 +11,26 @@ if __name__ == "__main__":
     project_root = Path(__file__).resolve().parent.parent.parent.parent
     sys.path.insert(0, str(project_root))
 
+import dataclasses
+import functools
+import inspect
 import logging
+import operator
 from typing import Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
+from types import MappingProxyType
 from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
 from starlette.routing import Mount, Route
 import uvicorn
+import orjson
+import aiofiles
+import aiofiles.os
 #!/usr/bin/env python3
 import sys
 # from pathlib import Path
@@ -37,6 +45,8 @@ from src.servers.models.local_models import (
     CalculateOutput,
     WeatherInput,
     WeatherOutput,
+    WeatherBatchInput,
+    WeatherBatchOutput,
     NoteInput,
     NoteOutput,
     TemperatureInput,
@@ -45,50 +55,102 @@ from src.servers.models.local_models import (
     FileReadOutput,
     TimeInput,
     TimeOutput,
-    ErrorOutput,
+    CALC_IN_ADAPTER,
+    WEATHER_IN_ADAPTER,
+    WEATHER_BATCH_IN_ADAPTER,
+    NOTE_IN_ADAPTER,
+    TEMP_IN_ADAPTER,
+    FILE_IN_ADAPTER,
+    TIME_IN_ADAPTER,
+    MSGPACK_MEDIA_TYPE,
+    encode,
+    encode_msgpack,
+    error_bytes,
+    init_env,
+    now_us,
+    configure_logging,
 )
 import os
 
-# Rest of your imports and code...
-from dotenv import load_dotenv
 # from ..models.local_models import *
 
 # from servers.models.local_models import CalculateInput
 
 # Load environment variables
-load_dotenv()
+init_env()
 
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8080/sse")
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize MCP server
 app = Server("pydantic-mcp-server")
 
+# Arithmetic dispatch for calculate
+_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": operator.truediv,
+}
+
+# Shared UTC tzinfo so formatted times match the "UTC" label in TimeOutput
+_UTC = timezone.utc
+
+# get_time output per format, reused within the same wall-clock second
+_TIME_CACHE: dict[str, tuple[int, str]] = {}
+
+# Note filenames: separators and NULs collapse to "_" in a single translate pass,
+# and the resolved path must stay inside the notes directory. read_file reads
+# from the same directory so it can open saved notes.
+_FN_TABLE = str.maketrans({" ": "_", "/": "_", "\\": "_", ":": "_", "\x00": "_"})
+_SAFE_DIR = Path(os.getenv("NOTES_DIR", ".")).resolve()
+_SAFE_DIR.mkdir(parents=True, exist_ok=True)
+
 # ============================================================================
 # TOOL IMPLEMENTATIONS - Using Pydantic models
 # ============================================================================
 
+def dump_json(model: Any) -> str:
+    """Serialize a model or output dataclass to indented JSON via orjson"""
+    return encode(model, indent=True).decode()
+
+
+def error_response(error_type: str, error_message: str) -> list[TextContent]:
+    """Build a structured error response without an ErrorOutput instance"""
+    return [TextContent(
+        type="text",
+        text=error_bytes(error_type, error_message).decode()
+    )]
+
+
+def _error(exc: Exception) -> list[TextContent]:
+    """Structured error response for an exception raised by a handler"""
+    return error_response(type(exc).__name__, str(exc))
+
+
+def _call_cached(cached_fn, arguments: dict[str, Any], field_name: str) -> str:
+    """Serialize an lru_cache'd handler output, stamped with the current time"""
+    key = tuple(arguments.items())
+    # Only a lone scalar argument is cached; anything else (extra keys, large or
+    # nested payloads) goes through the uncached body so it never sits in the key
+    if arguments.keys() == {field_name} and type(arguments[field_name]) in (str, int, float):
+        output = cached_fn(key)
+    else:
+        output = cached_fn.__wrapped__(key)
+    return dump_json(dataclasses.replace(output, timestamp_us=now_us()))
+
+
 def calculate(arguments: dict[str, Any]) -> list[TextContent]:
     """Perform calculations with validated inputs and structured output"""
     try:
         # Validate input
-        input_data = CalculateInput(**arguments)
+        input_data = CALC_IN_ADAPTER.validate_python(arguments)
         
         # Perform calculation
-        operations = {
-            "add": lambda x, y: x + y,
-            "subtract": lambda x, y: x - y,
-            "multiply": lambda x, y: x * y,
-            "divide": lambda x, y: x / y
-        }
-        
-        result = operations[input_data.operation](input_data.a, input_data.b)
+        result = _OPS[input_data.operation](input_data.a, input_data.b)
         
         # Create structured output
         output = CalculateOutput(
@@ -99,71 +161,102 @@ def calculate(arguments: dict[str, Any]) -> list[TextContent]:
             formatted=f"{input_data.a} {input_data.operation} {input_data.b} = {result}"
         )
         
-        logger.info(f"Calculation: {output.formatted}")
+        logger.info("Calculation: %s", output.formatted)
         
         # Return as JSON
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=dump_json(output)
         )]
         
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in calculate: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+        logger.error("Error in calculate: %s", e)
+        return _error(e)
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_weather_output(key: tuple) -> WeatherOutput:
+    """Validated weather output for a given set of arguments"""
+    # Validate input
+    input_data = WEATHER_IN_ADAPTER.validate_python(dict(key))
+    
+    # Simulated weather data
+    output = WeatherOutput(
+        city=input_data.city,
+        temperature="72°F",
+        temperature_celsius=22.2,
+        condition="Sunny",
+        humidity="45%",
+        wind="10 mph"
+    )
+    return output
 
 
 def get_weather(arguments: dict[str, Any]) -> list[TextContent]:
     """Get weather with validated inputs and structured output"""
+    try:
+        text = _call_cached(_get_weather_output, arguments, "city")
+        
+        logger.info("Weather requested for: %s", arguments.get("city"))
+        
+        return [TextContent(
+            type="text",
+            text=text
+        )]
+        
+    except Exception as e:
+        logger.error("Error in get_weather: %s", e)
+        return _error(e)
+
+
+def get_weather_batch(arguments: dict[str, Any]) -> list[TextContent]:
+    """Get weather for several cities in one call with parallel-list output"""
     try:
         # Validate input
-        input_data = WeatherInput(**arguments)
-        
-        # Simulated weather data
-        output = WeatherOutput(
-            city=input_data.city,
-            temperature="72°F",
-            temperature_celsius=22.2,
-            condition="Sunny",
-            humidity="45%",
-            wind="10 mph"
+        input_data = WEATHER_BATCH_IN_ADAPTER.validate_python(arguments)
+        count = len(input_data.cities)
+        
+        # Simulated weather data, one list per field
+        output = WeatherBatchOutput(
+            cities=list(input_data.cities),
+            temperatures_celsius=[22.2] * count,
+            conditions=["Sunny"] * count,
+            humidity_pct=[45] * count
         )
         
-        logger.info(f"Weather requested for: {input_data.city}")
+        logger.info("Weather requested for %s cities", count)
         
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=dump_json(output)
         )]
         
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in get_weather: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+        logger.error("Error in get_weather_batch: %s", e)
+        return _error(e)
 
 
-def save_note(arguments: dict[str, Any]) -> list[TextContent]:
+async def save_note(arguments: dict[str, Any]) -> list[TextContent]:
     """Save note with validated inputs and structured output"""
     try:
         # Validate input
-        input_data = NoteInput(**arguments)
+        input_data = NOTE_IN_ADAPTER.validate_python(arguments)
         
         # Create safe filename
-        filename = f"note_{input_data.title.replace(' ', '_')}.txt"
+        safe_name = input_data.title.translate(_FN_TABLE)[:128]
+        target = (_SAFE_DIR / f"note_{safe_name}.txt").resolve()
+        if not target.is_relative_to(_SAFE_DIR):
+            raise ValueError("Invalid note title - path traversal not allowed")
+        filename = target.name
+        created_at_us = now_us()
         
         # Write note with metadata
-        with open(filename, 'w') as f:
-            f.write(f"Title: {input_data.title}\n")
-            f.write(f"Created: {datetime.now().isoformat()}\n")
+        async with aiofiles.open(target, 'w') as f:
+            await f.write(f"Title: {input_data.title}\n")
+            await f.write(f"Created: {datetime.fromtimestamp(created_at_us / 1_000_000, _UTC).isoformat()}\n")
             if input_data.tags:
-                f.write(f"Tags: {', '.join(input_data.tags)}\n")
-            f.write(f"\n{input_data.content}")
+                await f.write(f"Tags: {', '.join(input_data.tags)}\n")
+            await f.write(f"\n{input_data.content}")
         
         # Create structured output
         output = NoteOutput(
@@ -171,104 +264,112 @@ def save_note(arguments: dict[str, Any]) -> list[TextContent]:
             title=input_data.title,
             content_length=len(input_data.content),
             tags=input_data.tags,
+            created_at_us=created_at_us,
             message=f"Note successfully saved to {filename}"
         )
         
-        logger.info(f"Note saved: {filename}")
+        logger.info("Note saved: %s", filename)
         
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=dump_json(output)
         )]
         
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in save_note: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+        logger.error("Error in save_note: %s", e)
+        return _error(e)
+
+
+@functools.lru_cache(maxsize=1024)
+def _convert_temperature_output(key: tuple) -> TemperatureOutput:
+    """Validated conversion output for a given set of arguments"""
+    # Validate input
+    input_data = TEMP_IN_ADAPTER.validate_python(dict(key))
+    
+    # Convert
+    celsius = (input_data.temperature_fahrenheit - 32) * 5.0 / 9.0
+    
+    # Create structured output
+    output = TemperatureOutput(
+        fahrenheit=input_data.temperature_fahrenheit,
+        celsius=round(celsius, 2),
+        formatted=f"{input_data.temperature_fahrenheit}°F = {celsius:.2f}°C"
+    )
+    return output
 
 
 def convert_temperature(arguments: dict[str, Any]) -> list[TextContent]:
     """Convert temperature with validated inputs and structured output"""
     try:
-        # Validate input
-        input_data = TemperatureInput(**arguments)
+        text = _call_cached(_convert_temperature_output, arguments, "temperature_fahrenheit")
         
-        # Convert
-        celsius = (input_data.temperature_fahrenheit - 32) * 5.0 / 9.0
-        
-        # Create structured output
-        output = TemperatureOutput(
-            fahrenheit=input_data.temperature_fahrenheit,
-            celsius=round(celsius, 2),
-            formatted=f"{input_data.temperature_fahrenheit}°F = {celsius:.2f}°C"
-        )
-        
-        logger.info(f"Temperature conversion: {output.formatted}")
+        logger.info("Temperature conversion: %s°F", arguments.get("temperature_fahrenheit"))
         
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=text
         )]
         
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in convert_temperature: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+        logger.error("Error in convert_temperature: %s", e)
+        return _error(e)
 
 
-def read_file(arguments: dict[str, Any]) -> list[TextContent]:
+async def read_file(arguments: dict[str, Any]) -> list[TextContent]:
     """Read file with validated inputs and structured output"""
     try:
         # Validate input
-        input_data = FileReadInput(**arguments)
+        input_data = FILE_IN_ADAPTER.validate_python(arguments)
+        
+        # Read file (filename is a validated basename inside the notes directory)
+        path = _SAFE_DIR / input_data.filename
+        st = await aiofiles.os.stat(path)
+        async with aiofiles.open(path, 'r') as f:
+            content = await f.read()
         
-        # Read file
-        with open(input_data.filename, 'r') as f:
-            content = f.read()
+        # Count lines in one pass without building a list of them
+        lines = content.count('\n') + (0 if content.endswith('\n') or not content else 1)
         
         # Create structured output
         output = FileReadOutput(
             filename=input_data.filename,
             content=content,
-            size_bytes=len(content.encode('utf-8')),
-            lines=len(content.splitlines())
+            size_bytes=st.st_size,
+            lines=lines
         )
         
-        logger.info(f"File read: {input_data.filename}")
+        logger.info("File read: %s", input_data.filename)
         
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=dump_json(output)
         )]
         
     except FileNotFoundError:
-        error = ErrorOutput(
-            error_type="FileNotFoundError",
-            error_message=f"File '{arguments.get('filename')}' not found"
+        return error_response(
+            "FileNotFoundError",
+            f"File '{arguments.get('filename')}' not found"
         )
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in read_file: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+        logger.error("Error in read_file: %s", e)
+        return _error(e)
 
 
 def get_time(arguments: dict[str, Any]) -> list[TextContent]:
     """Get time with validated inputs and structured output"""
     try:
         # Validate input
-        input_data = TimeInput(**arguments)
+        input_data = TIME_IN_ADAPTER.validate_python(arguments)
+        logger.info("Time requested in format: %s", input_data.format)
+        
+        # Serve repeat requests within the same second from the cache
+        timestamp_us = now_us()
+        now_int = timestamp_us // 1_000_000
+        cached = _TIME_CACHE.get(input_data.format)
+        if cached is not None and cached[0] == now_int:
+            return [TextContent(type="text", text=cached[1])]
         
-        now = datetime.now()
+        now = datetime.fromtimestamp(timestamp_us / 1_000_000, _UTC)
         
         # Format based on request
         if input_data.format == "iso":
@@ -280,93 +381,168 @@ def get_time(arguments: dict[str, Any]) -> list[TextContent]:
         
         # Create structured output
         output = TimeOutput(
-            timestamp=now,
+            timestamp_us=timestamp_us,
             formatted=formatted,
             format_type=input_data.format
         )
         
-        logger.info(f"Time requested in format: {input_data.format}")
+        text = dump_json(output)
+        _TIME_CACHE[input_data.format] = (now_int, text)
         
         return [TextContent(
             type="text",
-            text=output.model_dump_json(indent=2)
+            text=text
         )]
         
     except Exception as e:
-        error = ErrorOutput(
-            error_type=type(e).__name__,
-            error_message=str(e)
-        )
-        logger.error(f"Error in get_time: {e}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
-
-
-# Tool handler registry
-TOOL_HANDLERS = {
-    "calculate": calculate,
-    "get_weather": get_weather,
-    "save_note": save_note,
-    "convert_temperature": convert_temperature,
-    "read_file": read_file,
-    "get_time": get_time,
-}
+        logger.error("Error in get_time: %s", e)
+        return _error(e)
+
+
+# Tool registry: name, description, input model and handler for each tool
+TOOL_SPECS = (
+    (
+        "calculate",
+        "Perform arithmetic calculations with type-safe inputs and structured output",
+        CalculateInput,
+        calculate,
+    ),
+    (
+        "get_weather",
+        "Get weather information with validated city input and structured JSON output",
+        WeatherInput,
+        get_weather,
+    ),
+    (
+        "get_weather_batch",
+        "Get weather for multiple cities at once with structured, column-oriented JSON output",
+        WeatherBatchInput,
+        get_weather_batch,
+    ),
+    (
+        "save_note",
+        "Save a note with optional tags, validated inputs, and structured output",
+        NoteInput,
+        save_note,
+    ),
+    (
+        "convert_temperature",
+        "Convert Fahrenheit to Celsius with validation and structured output",
+        TemperatureInput,
+        convert_temperature,
+    ),
+    (
+        "read_file",
+        "Read file contents with path traversal protection and structured output",
+        FileReadInput,
+        read_file,
+    ),
+    (
+        "get_time",
+        "Get current time in various formats with structured output",
+        TimeInput,
+        get_time,
+    ),
+)
+
+# Tool handler registry (read-only)
+TOOL_HANDLERS = MappingProxyType({
+    name: handler for name, _, _, handler in TOOL_SPECS
+})
+
+# File IO handlers are async; CPU-only handlers stay sync
+_ASYNC_HANDLERS = frozenset(
+    name for name, handler in TOOL_HANDLERS.items()
+    if inspect.iscoroutinefunction(handler)
+)
 
 
 # ============================================================================
 # MCP SERVER SETUP
 # ============================================================================
 
+_TOOLS_CACHED = [
+    Tool(name=name, description=description, inputSchema=model.model_json_schema())
+    for name, description, model, _ in TOOL_SPECS
+]
+
+# Pre-serialized bodies (JSON and MessagePack) for the static /health and /tools endpoints
+_HEALTH_PAYLOAD = {
+    "status": "healthy",
+    "server": "Pydantic MCP Server (SSE)",
+    "endpoints": {
+        "sse": "/sse",
+        "messages": "/messages/",
+        "health": "/health"
+    },
+    "tools": list(TOOL_HANDLERS.keys())
+}
+
+_TOOLS_PAYLOAD = {
+    "tools": [
+        {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": tool.inputSchema
+        }
+        for tool in _TOOLS_CACHED
+    ]
+}
+
+_HEALTH_JSON_BYTES = orjson.dumps(_HEALTH_PAYLOAD)
+_HEALTH_MSGPACK_BYTES = encode_msgpack(_HEALTH_PAYLOAD)
+_TOOLS_JSON_BYTES = orjson.dumps(_TOOLS_PAYLOAD)
+_TOOLS_MSGPACK_BYTES = encode_msgpack(_TOOLS_PAYLOAD)
+
+# Both representations share a URL, so caches must key on Accept
+_VARY_ACCEPT = {"Vary": "Accept"}
+
+
+@functools.lru_cache(maxsize=64)
+def _prefers_msgpack(accept: str) -> bool:
+    """Whether an Accept header lists MessagePack with q > 0 and no lower than JSON"""
+    quality = {}
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[media_type.strip().lower()] = q
+    msgpack_q = quality.get(MSGPACK_MEDIA_TYPE, 0.0)
+    return msgpack_q > 0 and msgpack_q >= quality.get("application/json", 0.0)
+
+
+def negotiated_response(request: Request, json_body: bytes, msgpack_body: bytes) -> Response:
+    """Return MessagePack when the client prefers it, JSON otherwise"""
+    if _prefers_msgpack(request.headers.get("accept", "")):
+        return Response(content=msgpack_body, media_type=MSGPACK_MEDIA_TYPE, headers=_VARY_ACCEPT)
+    return Response(content=json_body, media_type="application/json", headers=_VARY_ACCEPT)
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List all available tools with Pydantic schema"""
-    return [
-        Tool(
-            name="calculate",
-            description="Perform arithmetic calculations with type-safe inputs and structured output",
-            inputSchema=CalculateInput.model_json_schema()
-        ),
-        Tool(
-            name="get_weather",
-            description="Get weather information with validated city input and structured JSON output",
-            inputSchema=WeatherInput.model_json_schema()
-        ),
-        Tool(
-            name="save_note",
-            description="Save a note with optional tags, validated inputs, and structured output",
-            inputSchema=NoteInput.model_json_schema()
-        ),
-        Tool(
-            name="convert_temperature",
-            description="Convert Fahrenheit to Celsius with validation and structured output",
-            inputSchema=TemperatureInput.model_json_schema()
-        ),
-        Tool(
-            name="read_file",
-            description="Read file contents with path traversal protection and structured output",
-            inputSchema=FileReadInput.model_json_schema()
-        ),
-        Tool(
-            name="get_time",
-            description="Get current time in various formats with structured output",
-            inputSchema=TimeInput.model_json_schema()
-        ),
-    ]
+    return _TOOLS_CACHED
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool execution with Pydantic validation"""
-    logger.info(f"Tool called: {name} with arguments: {arguments}")
+    logger.info("Tool called: %s with arguments: %s", name, arguments)
     
-    if name in TOOL_HANDLERS:
-        return TOOL_HANDLERS[name](arguments)
-    else:
-        error = ErrorOutput(
-            error_type="UnknownToolError",
-            error_message=f"Unknown tool: {name}"
-        )
-        logger.warning(f"Unknown tool requested: {name}")
-        return [TextContent(type="text", text=error.model_dump_json(indent=2))]
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        logger.warning("Unknown tool requested: %s", name)
+        return error_response("UnknownToolError", f"Unknown tool: {name}")
+    
+    if name in _ASYNC_HANDLERS:
+        return await handler(arguments)
+    return handler(arguments)
 
 
 # ============================================================================
@@ -380,7 +556,7 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
     async def handle_sse(request: Request):
         """Handle SSE connections"""
         try:
-            logger.info(f"New SSE connection from {request.client.host}")
+            logger.info("New SSE connection from %s", request.client.host)
             async with sse.connect_sse(
                 request.scope,
                 request.receive,
@@ -394,7 +570,7 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
             logger.info("SSE connection closed")
             return Response(status_code=204)
         except Exception as e:
-            logger.error(f"Error in SSE handler: {e}", exc_info=True)
+            logger.error("Error in SSE handler: %s", e, exc_info=True)
             return Response(
                 content=f"Internal Server Error: {str(e)}\n",
                 status_code=500,
@@ -403,30 +579,11 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
 
     async def health_check(request: Request):
         """Health check endpoint"""
-        return JSONResponse({
-            "status": "healthy",
-            "server": "Pydantic MCP Server (SSE)",
-            "endpoints": {
-                "sse": "/sse",
-                "messages": "/messages/",
-                "health": "/health"
-            },
-            "tools": list(TOOL_HANDLERS.keys())
-        })
+        return negotiated_response(request, _HEALTH_JSON_BYTES, _HEALTH_MSGPACK_BYTES)
     
     async def list_tools_endpoint(request: Request):
         """List available tools via HTTP"""
-        tools_list = await list_tools()
-        return JSONResponse({
-            "tools": [
-                {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "inputSchema": tool.inputSchema
-                }
-                for tool in tools_list
-            ]
-        })
+        return negotiated_response(request, _TOOLS_JSON_BYTES, _TOOLS_MSGPACK_BYTES)
 
     return Starlette(
         debug=debug,
@@ -472,17 +629,22 @@ def main():
     # Use PORT from environment (Render provides this)
     port = int(os.environ.get("PORT", 8080))
     
-    logger.info(f"SSE endpoint: http://0.0.0.0:{port}/sse")
-    logger.info(f"Health check: http://0.0.0.0:{port}/health")
-    logger.info(f"Tools list: http://0.0.0.0:{port}/tools")
-    logger.info(f"Available tools: {list(TOOL_HANDLERS.keys())}")
+    logger.info("SSE endpoint: http://0.0.0.0:%s/sse", port)
+    logger.info("Health check: http://0.0.0.0:%s/health", port)
+    logger.info("Tools list: http://0.0.0.0:%s/tools", port)
+    logger.info("Available tools: %s", list(TOOL_HANDLERS.keys()))
     
-    # Run the server using uvicorn
+    # Run the server using uvicorn. "auto" picks uvloop and httptools when
+    # installed. Keep a single worker: SseServerTransport stores sessions in
+    # process memory, so POST /messages/ must reach the process holding /sse.
     uvicorn.run(
         starlette_app,
         host="0.0.0.0",
         port=port,
-        log_level="info"
+        loop="auto",
+        http="auto",
+        workers=1,
+        log_level="warning"
     )
 
 
@@ -5,158 +5,321 @@ Provides type-safe tool inputs and structured outputs over HTTP with SSE
 """
 
 import logging
-from typing import Any, Optional
-from datetime import datetime
-from pathlib import Path
+from dataclasses import field
+from typing import Annotated, Any, Literal, Optional, TypeVar, Union
+import time
 
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from dotenv import load_dotenv
+import msgspec
+import orjson
+from pydantic import BaseModel, BeforeValidator, Field, StringConstraints, TypeAdapter, field_validator, model_validator, ConfigDict
+from pydantic.dataclasses import dataclass
 
-load_dotenv()
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+__all__ = [
+    "CalculateInput",
+    "WeatherInput",
+    "WeatherBatchInput",
+    "NoteInput",
+    "TemperatureInput",
+    "FileReadInput",
+    "TimeInput",
+    "CalculateOutput",
+    "WeatherOutput",
+    "WeatherBatchOutput",
+    "NoteOutput",
+    "TemperatureOutput",
+    "FileReadOutput",
+    "TimeOutput",
+    "ErrorOutput",
+    "CalculateResult",
+    "WeatherResult",
+    "WeatherBatchResult",
+    "NoteResult",
+    "TemperatureResult",
+    "FileReadResult",
+    "TimeResult",
+    "CALC_IN_ADAPTER",
+    "WEATHER_IN_ADAPTER",
+    "WEATHER_BATCH_IN_ADAPTER",
+    "NOTE_IN_ADAPTER",
+    "TEMP_IN_ADAPTER",
+    "FILE_IN_ADAPTER",
+    "TIME_IN_ADAPTER",
+    "encode",
+    "encode_msgpack",
+    "MSGPACK_MEDIA_TYPE",
+    "error_bytes",
+    "init_env",
+    "now_us",
+    "configure_logging",
+    "parse_input",
+]
+
+
+def init_env() -> None:
+    """Load environment variables from .env (call once from the entry point)"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Attach the root log handler (call once from the entry point)"""
+    root = logging.getLogger()
+    root.setLevel(level)
+    if root.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        "{asctime} - {name} - {levelname} - {message}",
+        style="{"
+    ))
+    root.addHandler(handler)
+
+
+def encode(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize a model, output dataclass or plain dict to JSON bytes via orjson"""
+    if isinstance(obj, BaseModel):
+        obj = obj.model_dump(mode="python")
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+
+EpochMicros = Annotated[int, Field(description="Unix epoch time in microseconds")]
+
+
+def now_us() -> int:
+    """Current time as integer microseconds since the Unix epoch"""
+    return time.time_ns() // 1000
+
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MP_ENC = msgspec.msgpack.Encoder()
+
+
+def encode_msgpack(obj: Any) -> bytes:
+    """Serialize an output dataclass or plain dict to MessagePack bytes"""
+    return _MP_ENC.encode(obj)
+
+
+def error_bytes(error_type: str, error_message: str) -> bytes:
+    """Serialize an error response (ErrorOutput shape) from a plain dict"""
+    return orjson.dumps({
+        "kind": "err",
+        "success": False,
+        "error_type": error_type,
+        "error_message": error_message,
+        "timestamp_us": now_us()
+    }, option=orjson.OPT_INDENT_2)
+
+
+# Title sanitization: drop every Latin-1 character outside the safe set in a
+# single translate pass (non-ASCII is removed before translating)
+_TITLE_SAFE_CHARS: frozenset[str] = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_ ")
+_DROP_TABLE = str.maketrans("", "", "".join(chr(c) for c in range(256) if chr(c) not in _TITLE_SAFE_CHARS))
+
+InputModel = TypeVar("InputModel", bound=BaseModel)
+
+
+def parse_input(cls: type[InputModel], body: bytes | str) -> InputModel:
+    """Validate a raw JSON body into an input model (no json.loads round-trip)"""
+    return cls.model_validate_json(body)
+
+
+# Filename check: ASCII only, no separators, control or reserved characters.
+# Deleting the forbidden bytes is one C-level pass; any change in length means
+# the name contained one.
+_SEPARATOR_BYTES = b'/\\'
+_BAD_FILENAME_BYTES = bytes(range(32)) + b':*?"<>|\x7f'
+
+
+def _validate_filename(v: Any) -> Any:
+    """Ensure filename is safe (no path traversal)"""
+    if not isinstance(v, str):
+        return v  # Let str validation report the type error
+    try:
+        b = v.encode("ascii", "strict")
+    except UnicodeEncodeError:
+        raise ValueError("Invalid filename - only ASCII names are allowed")
+    if len(b.translate(None, _SEPARATOR_BYTES)) != len(b) or b in (b".", b".."):
+        raise ValueError("Invalid filename - path traversal not allowed")
+    if len(b.translate(None, _BAD_FILENAME_BYTES)) != len(b):
+        raise ValueError('Invalid filename - control characters and : * ? " < > | are not allowed')
+    return v
+
+
 # PYDANTIC INPUT MODELS - Type-safe tool inputs
 
 class CalculateInput(BaseModel):
     """Input model for calculation tool"""
-    operation: str = Field(..., description="Arithmetic operation", pattern="^(add|subtract|multiply|divide)$")
+    model_config = ConfigDict(frozen=True)
+    
+    operation: Literal["add", "subtract", "multiply", "divide"] = Field(..., description="Arithmetic operation")
     a: float = Field(..., description="First number")
     b: float = Field(..., description="Second number")
     
-    @field_validator('b')
-    @classmethod
-    def validate_division(cls, v, info):
+    @model_validator(mode='after')
+    def validate_division(self):
         """Prevent division by zero"""
-        if info.data.get('operation') == 'divide' and v == 0:
+        if self.operation == 'divide' and self.b == 0:
             raise ValueError("Cannot divide by zero")
-        return v
+        return self
 
 
 class WeatherInput(BaseModel):
     """Input model for weather tool"""
-    city: str = Field(..., description="City name", min_length=1, max_length=100)
+    model_config = ConfigDict(frozen=True)
     
-    @field_validator('city')
-    @classmethod
-    def validate_city(cls, v):
-        """Sanitize city name"""
-        return v.strip()
+    # Whitespace is stripped by pydantic-core before the length checks
+    city: Annotated[
+        str,
+        StringConstraints(strip_whitespace=True, min_length=1, max_length=100),
+        Field(description="City name")
+    ]
+
+
+class WeatherBatchInput(BaseModel):
+    """Input model for multi-city weather tool"""
+    model_config = ConfigDict(frozen=True)
+    
+    cities: list[
+        Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)]
+    ] = Field(..., description="City names", min_length=1, max_length=50)
 
 
 class NoteInput(BaseModel):
     """Input model for saving notes"""
+    model_config = ConfigDict(frozen=True)
+    
     title: str = Field(..., description="Note title", min_length=1, max_length=100)
     content: str = Field(..., description="Note content", min_length=1)
-    tags: Optional[list[str]] = Field(default=None, description="Optional tags for categorization")
+    tags: list[str] = Field(default_factory=list, description="Optional tags for categorization")
     
     @field_validator('title')
     @classmethod
     def sanitize_title(cls, v):
         """Sanitize title for safe filename"""
         # Remove special characters
-        safe_chars = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_ ")
-        sanitized = "".join(c for c in v if c in safe_chars).strip()
+        sanitized = v.encode("ascii", "ignore").decode().translate(_DROP_TABLE).strip()
         if not sanitized:
             raise ValueError("Title must contain at least one alphanumeric character")
         return sanitized
+    
+    @field_validator('tags', mode='before')
+    @classmethod
+    def default_tags(cls, v):
+        """Treat an explicit null as no tags"""
+        return [] if v is None else v
 
 
 class TemperatureInput(BaseModel):
     """Input model for temperature conversion"""
-    temperature_fahrenheit: float = Field(..., description="Temperature in Fahrenheit")
+    model_config = ConfigDict(frozen=True)
     
-    @field_validator('temperature_fahrenheit')
-    @classmethod
-    def validate_temperature(cls, v):
-        """Validate temperature is within reasonable bounds"""
-        if v < -459.67:  # Absolute zero in Fahrenheit
-            raise ValueError("Temperature cannot be below absolute zero (-459.67°F)")
-        return v
+    # Cannot be below absolute zero (-459.67°F)
+    temperature_fahrenheit: Annotated[
+        float,
+        Field(ge=-459.67, description="Temperature in Fahrenheit")
+    ]
 
 
 class FileReadInput(BaseModel):
     """Input model for reading files"""
-    filename: str = Field(..., description="Name of file to read", min_length=1)
+    model_config = ConfigDict(frozen=True)
     
-    @field_validator('filename')
-    @classmethod
-    def validate_filename(cls, v):
-        """Ensure filename is safe (no path traversal)"""
-        # Only allow basename, no path components
-        safe_filename = Path(v).name
-        if not safe_filename or safe_filename != v:
-            raise ValueError("Invalid filename - path traversal not allowed")
-        return safe_filename
+    filename: Annotated[
+        str,
+        StringConstraints(min_length=1),
+        BeforeValidator(_validate_filename),
+        Field(description="Name of file to read")
+    ]
 
 
 class TimeInput(BaseModel):
     """Input model for getting time"""
-    format: str = Field(
+    model_config = ConfigDict(frozen=True)
+    
+    format: Literal["iso", "human", "unix"] = Field(
         default="iso",
-        description="Time format",
-        pattern="^(iso|human|unix)$"
+        description="Time format"
     )
 
 
 # PYDANTIC OUTPUT MODELS - Structured responses
+# Frozen, slotted dataclasses: no per-instance __dict__, and orjson encodes them natively.
+# Timestamps are integer microseconds since the Unix epoch; clients format them as needed.
+# Every output carries a "kind" tag ("ok" / "err") so tool results are tagged unions.
 
-class CalculateOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True, config=ConfigDict(json_schema_extra={
+    "example": {
+        "operation": "multiply",
+        "operand_a": 5,
+        "operand_b": 3,
+        "result": 15,
+        "formatted": "5 multiply 3 = 15"
+    }
+}))
+class CalculateOutput:
     """Structured output for calculations"""
-    model_config = ConfigDict(json_schema_extra={
-        "example": {
-            "operation": "multiply",
-            "operand_a": 5,
-            "operand_b": 3,
-            "result": 15,
-            "formatted": "5 multiply 3 = 15"
-        }
-    })
-    
+    kind: Literal["ok"] = "ok"
     operation: str
     operand_a: float
     operand_b: float
     result: float
     formatted: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_us: EpochMicros = field(default_factory=now_us)
 
 
-class WeatherOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class WeatherOutput:
     """Structured output for weather data"""
+    kind: Literal["ok"] = "ok"
     city: str
     temperature: str
     temperature_celsius: Optional[float] = None
     condition: str
     humidity: str
     wind: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_us: EpochMicros = field(default_factory=now_us)
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class WeatherBatchOutput:
+    """Structured output for multi-city weather data (one parallel list per field)"""
+    kind: Literal["ok"] = "ok"
+    cities: list[str]
+    temperatures_celsius: list[float]
+    conditions: list[str]
+    humidity_pct: list[int]
+    timestamp_us: EpochMicros = field(default_factory=now_us)
 
 
-class NoteOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class NoteOutput:
     """Structured output for note operations"""
+    kind: Literal["ok"] = "ok"
     filename: str
     title: str
     content_length: int
-    tags: Optional[list[str]] = None
-    created_at: datetime = Field(default_factory=datetime.now)
+    tags: list[str] = field(default_factory=list)
+    created_at_us: EpochMicros = field(default_factory=now_us)
     success: bool = True
     message: str
 
 
-class TemperatureOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class TemperatureOutput:
     """Structured output for temperature conversion"""
+    kind: Literal["ok"] = "ok"
     fahrenheit: float
     celsius: float
     formatted: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_us: EpochMicros = field(default_factory=now_us)
 
 
-class FileReadOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class FileReadOutput:
     """Structured output for file reading"""
+    kind: Literal["ok"] = "ok"
     filename: str
     content: str
     size_bytes: int
@@ -164,17 +327,43 @@ class FileReadOutput(BaseModel):
     success: bool = True
 
 
-class TimeOutput(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class TimeOutput:
     """Structured output for time requests"""
-    timestamp: datetime
+    kind: Literal["ok"] = "ok"
+    timestamp_us: EpochMicros
     formatted: str
     format_type: str
     timezone: str = "UTC"
 
 
-class ErrorOutput(BaseModel):
-    """Structured error response"""
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ErrorOutput:
+    """Structured error response (schema only; responses are built by error_bytes)"""
+    kind: Literal["err"] = "err"
     success: bool = False
     error_type: str
     error_message: str
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_us: EpochMicros = field(default_factory=now_us)
+
+
+# TOOL RESULTS - Success or error, discriminated on "kind"
+
+CalculateResult = Annotated[Union[CalculateOutput, ErrorOutput], Field(discriminator="kind")]
+WeatherResult = Annotated[Union[WeatherOutput, ErrorOutput], Field(discriminator="kind")]
+WeatherBatchResult = Annotated[Union[WeatherBatchOutput, ErrorOutput], Field(discriminator="kind")]
+NoteResult = Annotated[Union[NoteOutput, ErrorOutput], Field(discriminator="kind")]
+TemperatureResult = Annotated[Union[TemperatureOutput, ErrorOutput], Field(discriminator="kind")]
+FileReadResult = Annotated[Union[FileReadOutput, ErrorOutput], Field(discriminator="kind")]
+TimeResult = Annotated[Union[TimeOutput, ErrorOutput], Field(discriminator="kind")]
+
+
+# INPUT ADAPTERS - Built once at import so validation skips schema construction
+
+CALC_IN_ADAPTER = TypeAdapter(CalculateInput)
+WEATHER_IN_ADAPTER = TypeAdapter(WeatherInput)
+WEATHER_BATCH_IN_ADAPTER = TypeAdapter(WeatherBatchInput)
+NOTE_IN_ADAPTER = TypeAdapter(NoteInput)
+TEMP_IN_ADAPTER = TypeAdapter(TemperatureInput)
+FILE_IN_ADAPTER = TypeAdapter(FileReadInput)
+TIME_IN_ADAPTER = TypeAdapter(TimeInput)